@@ -9,6 +9,7 @@ class Agent:
     """
     Main agent entity. Aggregates state, senses, brain, body, and rendering.
     Provides property-based interface to state and senses for external usage.
+    The data itself lives in the simulation's AgentPool at this agent's slot.
     """
 
     def __init__(
@@ -27,11 +28,30 @@ class Agent:
             agent_radius (int): Sensing radius for other agents.
             personality: Agent behavioral type.
         """
-        self.state = AgentState(sim, x, y, color, energy, food_radius, agent_radius, personality)
+        self._init_components(AgentState(sim, x, y, color, energy, food_radius, agent_radius, personality))
+
+    @classmethod
+    def from_slot(cls, sim, slot):
+        """
+        Wraps an agent the pool has already spawned (see AgentPool.reproduce_batch).
+        Args:
+            sim: Simulation instance reference.
+            slot (int): Occupied pool slot.
+        """
+        agent = cls.__new__(cls)
+        agent._init_components(AgentState.from_slot(sim, slot))
+        return agent
+
+    def _init_components(self, state):
+        """
+        Attaches all components to the given state and registers the agent in its pool slot.
+        """
+        self.state = state
         self.senses = AgentSenses(self.state)
         self.brain = AgentBrain(self.state, self.senses)
         self.body = AgentBody(self.state, self.senses, agent_class=type(self))
         self.renderer = AgentRenderer(self.state)
+        self.state.pool.agents[self.state.slot] = self
 
     # ---- Core State Properties (proxy to AgentState) ----
 
@@ -39,6 +59,10 @@ class Agent:
     def sim(self):
         return self.state.sim
 
+    @property
+    def slot(self):
+        return self.state.slot
+
     @property
     def x(self):
         return self.state.x
@@ -188,14 +212,13 @@ class Agent:
 
     # ---- Agent Operations (delegation to brain/body/renderer) ----
 
-    def sense(self, food_grid, agent_grid):
+    def sense(self, food_mask):
         """
         Updates sensory inputs from the environment.
         Args:
-            food_grid: Set of (x, y) food positions.
-            agent_grid: Dict[(x, y)] -> List[Agent].
+            food_mask: Bool food mask [world_w, world_h].
         """
-        self.senses.update(food_grid, agent_grid)
+        self.senses.update(food_mask)
 
     def get_inputs(self):
         """
@@ -203,23 +226,20 @@ class Agent:
         """
         return self.brain.get_inputs()
 
-    def apply_move(self, action, hidden, cell, taken, trace_map, tick):
+    def apply_move(self, action, hidden, cell):
         """
-        Moves the agent according to a chosen action.
+        Moves the agent according to a chosen action, unless the target cell is occupied.
         Args:
             action: Integer movement action.
             hidden, cell: RNN state.
-            taken: Set of occupied positions.
-            trace_map: Dict[(x, y)] -> tick.
-            tick: Simulation step.
         """
-        self.body.apply_move(action, hidden, cell, taken, trace_map, tick)
+        self.body.apply_move(action, hidden, cell)
 
     def eat(self, food):
         """
         Consumes food at the agent's location if present.
         Args:
-            food: Set of (x, y) food positions.
+            food: Bool food mask [world_w, world_h].
         """
         self.body.eat(food)
 
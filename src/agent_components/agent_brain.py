@@ -1,14 +1,78 @@
 import numpy as np
 
-from src.config import N_HISTORY
+from src.config import N_HISTORY, PERSONALITY_CODE
+
+# Personality-based input bias: (input column, multiplier)
+PERSONALITY_BOOSTS = {
+    "explorer": (13, 1.2),   # Prioritize forward exploration (food_up_dist)
+    "survivor": (4, 1.2),    # Focus on average energy
+    "feeder": (0, 1.2),      # Prioritize immediate food detection
+    "loner": (1, 1.2),       # Heightened awareness of other agents
+    "social": (1, -1.2),     # Aversion to crowds
+}
+
+
+def _personality_mask(n_base_inputs):
+    """
+    Builds the [n_personalities, n_base_inputs] table of input multipliers from PERSONALITY_BOOSTS,
+    one row per PERSONALITY_CODE.
+    """
+    mask = np.ones((len(PERSONALITY_CODE), n_base_inputs), dtype=np.float32)
+    for personality, code in PERSONALITY_CODE.items():
+        col, factor = PERSONALITY_BOOSTS[personality]
+        mask[code, col] = factor
+    return mask
 
 
 class AgentBrain:
     """
     Encapsulates sensory processing and input vector construction for an agent.
     Maintains input history and applies personality bias to the agent's perception.
+    Inputs for the whole population are built at once by build_inputs_batch;
+    the input history lives in the agent pool as a per-slot circular buffer.
     """
 
+    INPUT_KEYS = [
+        # Sense features, read from the pool column of the same name
+        "sense_food",
+        "sense_agents",
+        "sense_friends",
+        "sense_others",
+        "avg_energy",
+        "max_energy",
+        "chemo_signal",
+        "edge_distance_x",
+        "edge_distance_y",
+        "food_up",
+        "food_down",
+        "food_left",
+        "food_right",
+        "food_up_dist",
+        "food_down_dist",
+        "food_left_dist",
+        "food_right_dist",
+        # Derived features
+        "visited_here",
+        "last_move_x",
+        "last_move_y",
+        "crowd_global",
+        "energy_global",
+        "old_age_global",
+    ]
+    N_SENSE_INPUTS = INPUT_KEYS.index("visited_here")
+    N_BASE_INPUTS = len(INPUT_KEYS)
+    N_INPUTS = N_BASE_INPUTS * (1 + N_HISTORY)
+
+    # Input normalization as reciprocals; ranges should be matched to simulation conventions.
+    # edge_distance_*, food_*_dist: assumed in [0, 1]
+    _NORM = np.ones(N_BASE_INPUTS, dtype=np.float32)
+    _NORM[[0, 1, 2, 3]] = 1 / 10.0         # sense_food, sense_agents, sense_friends, sense_others
+    _NORM[[4, 5]] = 1 / 200.0              # avg_energy, max_energy
+    _NORM[[6, 9, 10, 11, 12]] = 1 / 5.0    # chemo_signal, food_up/down/left/right
+
+    # Personality-based bias: one row of input multipliers per personality code
+    _PERSONALITY_MASK = _personality_mask(N_BASE_INPUTS)
+
     def __init__(self, state, senses):
         """
         Initializes the AgentBrain with agent state and sensory interface.
@@ -18,7 +82,6 @@ class AgentBrain:
         """
         self.state = state
         self.senses = senses
-        self.last_inputs = []
         self._init_input_shape()
 
     def _init_input_shape(self):
@@ -26,34 +89,10 @@ class AgentBrain:
         Defines the input feature keys and total input vector size,
         including history window.
         """
-        self.input_keys = [
-            "sense_food",
-            "sense_agents",
-            "sense_friends",
-            "sense_others",
-            "avg_energy",
-            "max_energy",
-            "chemo_signal",
-            "edge_distance_x",
-            "edge_distance_y",
-            "food_up",
-            "food_down",
-            "food_left",
-            "food_right",
-            "food_up_dist",
-            "food_down_dist",
-            "food_left_dist",
-            "food_right_dist",
-            "visited_here",
-            "last_move_x",
-            "last_move_y",
-            "crowd_global",
-            "energy_global",
-            "old_age_global",
-        ]
-        self.n_base_inputs = len(self.input_keys)
+        self.input_keys = self.INPUT_KEYS
+        self.n_base_inputs = self.N_BASE_INPUTS
         self.n_history = N_HISTORY
-        self.n_inputs = self.n_base_inputs * (1 + self.n_history)
+        self.n_inputs = self.N_INPUTS
 
     def get_inputs(self):
         """
@@ -63,83 +102,56 @@ class AgentBrain:
         Returns:
             np.ndarray: Normalized input vector of fixed length.
         """
-        s = self.senses
-        st = self.state
-
-        base_inputs = [
-            s.sense_food,
-            s.sense_agents,
-            s.sense_friends,
-            s.sense_others,
-            s.avg_energy,
-            s.max_energy,
-            s.chemo_signal,
-            s.edge_distance_x,
-            s.edge_distance_y,
-            s.food_up,
-            s.food_down,
-            s.food_left,
-            s.food_right,
-            s.food_up_dist,
-            s.food_down_dist,
-            s.food_left_dist,
-            s.food_right_dist,
-            1.0 if (st.x, st.y) in st.visited_last_10 else 0.0,
-            st.last_move[0],
-            st.last_move[1],
-            st.sim.ema_crowd,
-            st.sim.ema_energy,
-            st.sim.ema_old_age,
-        ]
-
-        # Normalize inputs; ranges should be matched to simulation conventions
-        base_inputs[0] /= 10.0    # sense_food
-        base_inputs[1] /= 10.0    # sense_agents
-        base_inputs[2] /= 10.0    # sense_friends
-        base_inputs[3] /= 10.0    # sense_others
-        base_inputs[4] /= 200.0   # avg_energy
-        base_inputs[5] /= 200.0   # max_energy
-        base_inputs[6] /= 5.0     # chemo_signal
-        # edge_distance_x, edge_distance_y: assumed in [0, 1]
-        base_inputs[9] /= 5.0     # food_up
-        base_inputs[10] /= 5.0    # food_down
-        base_inputs[11] /= 5.0    # food_left
-        base_inputs[12] /= 5.0    # food_right
-        # food_*_dist: assumed in [0, 1]
-
-        assert len(base_inputs) == self.n_base_inputs
-
-        # Concatenate historical inputs
-        flat_hist = []
-        for old in self.last_inputs:
-            flat_hist.extend(old)
-        while len(flat_hist) < self.n_base_inputs * self.n_history:
-            flat_hist.append(0.0)
-
-        inputs = np.array(base_inputs + flat_hist, dtype=np.float32)
-        assert len(inputs) == self.n_inputs
+        return self.build_inputs_batch(self.state.sim, np.array([self.state.slot]))[0]
+
+    @classmethod
+    def build_inputs_batch(cls, sim, slots, out=None):
+        """
+        Builds the input matrix for a batch of agents straight from the pool columns,
+        then pushes each agent's base inputs into its history buffer.
+        Args:
+            sim: Simulation instance (owns the pool and the global EMAs).
+            slots: Int array [N] of pool slots.
+            out: Optional float32 array [N, N_INPUTS] to fill instead of allocating a new one.
+        Returns:
+            np.ndarray: [N, N_INPUTS] float32 normalized inputs; base features first,
+                then the last N_HISTORY base vectors, oldest first and zero-padded.
+        """
+        pool = sim.pool
+        n = len(slots)
+        n_base = cls.N_BASE_INPUTS
+        inputs = np.empty((n, cls.N_INPUTS), dtype=np.float32) if out is None else out
+        base = inputs[:, :n_base]
+
+        for i, key in enumerate(cls.INPUT_KEYS[:cls.N_SENSE_INPUTS]):
+            base[:, i] = getattr(pool, key)[slots]
+        base[:, 17] = pool.visited_here(slots)
+        base[:, 18:20] = pool.last_moves[slots]
+        base[:, 20] = sim.ema_crowd
+        base[:, 21] = sim.ema_energy
+        base[:, 22] = sim.ema_old_age
+
+        base *= cls._NORM
+
+        # Concatenate historical inputs: walk each ring buffer from its oldest entry.
+        # Until a buffer is full its head equals its count, so the walk starts at 0
+        # and the never-written (zeroed) tail pads the end.
+        heads = pool.history_heads[slots]
+        counts = pool.history_counts[slots]
+        order = (heads - counts)[:, None] + np.arange(N_HISTORY)
+        order %= N_HISTORY
+        order += slots[:, None] * N_HISTORY
+        np.take(
+            pool.history.reshape(-1, n_base), order, axis=0,
+            out=inputs[:, n_base:].reshape(n, N_HISTORY, n_base), mode="clip"
+        )
 
         # Update input history
-        self.last_inputs.append(base_inputs)
-        if len(self.last_inputs) > self.n_history:
-            self.last_inputs = self.last_inputs[-self.n_history:]
+        pool.history[slots, heads] = base
+        pool.history_heads[slots] = (heads + 1) % N_HISTORY
+        pool.history_counts[slots] = np.minimum(counts + 1, N_HISTORY)
 
         # Apply personality-based bias to specific features
-        boost = 1.2
-        if st.personality == "explorer":
-            # Prioritize forward exploration
-            inputs[13] *= boost  # food_up_dist
-        elif st.personality == "survivor":
-            # Focus on average energy
-            inputs[4] *= boost
-        elif st.personality == "feeder":
-            # Prioritize immediate food detection
-            inputs[0] *= boost
-        elif st.personality == "loner":
-            # Heightened awareness of other agents
-            inputs[1] *= boost
-        elif st.personality == "social":
-            # Aversion to crowds
-            inputs[1] *= -boost
+        base *= cls._PERSONALITY_MASK[pool.personalities[slots]]
 
         return inputs
@@ -1,3 +1,4 @@
+import numpy as np
 import pygame
 
 from src.config import GRID_SIZE
@@ -34,3 +35,20 @@ class AgentRenderer:
         pygame.draw.rect(surf, self.agent.color, rect)
         if highlight:
             pygame.draw.rect(surf, self.HIGHLIGHT_COLOR, rect, self.HIGHLIGHT_WIDTH)
+
+    @staticmethod
+    def draw_batch(surf, xs, ys, colors):
+        """
+        Draws many agents at once by writing their cells straight into the surface pixels,
+        instead of one draw call per agent. Highlight borders are left to draw().
+        Args:
+            surf: Pygame surface to draw on (must not be locked by the caller).
+            xs, ys: Int arrays [N] of agent cell coordinates.
+            colors: Uint8 array [N, 3] of agent colors.
+        """
+        offsets = np.arange(GRID_SIZE)
+        px = (xs[:, None] * GRID_SIZE + offsets)[:, :, None]  # [N, GRID_SIZE, 1]
+        py = (ys[:, None] * GRID_SIZE + offsets)[:, None, :]  # [N, 1, GRID_SIZE]
+        pixels = pygame.surfarray.pixels3d(surf)
+        pixels[px, py] = colors[:, None, None, :]
+        del pixels  # Unlocks the surface
@@ -1,11 +1,50 @@
-from src.utils import clamp
+import numpy as np
+
+from src.senses_kernel import update_senses, direction_table
+
+
+def _sense(name, cast):
+    """
+    Builds a read-only property proxying one sense column of the agent pool at this agent's slot.
+    """
+    def fget(self):
+        return cast(getattr(self.state.pool, name)[self.state.slot])
+
+    return property(fget)
+
 
 class AgentSenses:
     """
     Aggregates and processes environmental sensory data for an agent.
     Computes local food, agents, friend/other counts, directional food, chemical signal, and normalized distances to map edge.
+    Results are stored in the sense columns of the agent pool.
     """
 
+    sense_food = _sense("sense_food", int)
+    sense_agents = _sense("sense_agents", int)
+    sense_friends = _sense("sense_friends", int)
+    sense_others = _sense("sense_others", int)
+    food_up = _sense("food_up", int)
+    food_down = _sense("food_down", int)
+    food_left = _sense("food_left", int)
+    food_right = _sense("food_right", int)
+    food_up_dist = _sense("food_up_dist", float)
+    food_down_dist = _sense("food_down_dist", float)
+    food_left_dist = _sense("food_left_dist", float)
+    food_right_dist = _sense("food_right_dist", float)
+    avg_energy = _sense("avg_energy", float)
+    max_energy = _sense("max_energy", float)
+    chemo_signal = _sense("chemo_signal", float)
+    edge_distance_x = _sense("edge_distance_x", float)
+    edge_distance_y = _sense("edge_distance_y", float)
+
+    SENSE_COLUMNS = (
+        "sense_food", "sense_agents", "sense_friends", "sense_others",
+        "food_up", "food_down", "food_left", "food_right",
+        "food_up_dist", "food_down_dist", "food_left_dist", "food_right_dist",
+        "avg_energy", "max_energy", "chemo_signal", "edge_distance_x", "edge_distance_y",
+    )
+
     def __init__(self, state):
         """
         Initializes the AgentSenses with the given agent state.
@@ -13,123 +52,41 @@ class AgentSenses:
             state: Agent's state object.
         """
         self.state = state
-        self.reset()
 
     def reset(self):
         """
         Resets all sensory data to default (empty) values.
         """
-        self.sense_food = 0
-        self.sense_agents = 0
-        self.sense_friends = 0
-        self.sense_others = 0
-        self.food_up = self.food_down = self.food_left = self.food_right = 0
-        self.food_up_dist = self.food_down_dist = self.food_left_dist = self.food_right_dist = None
-        self.avg_energy = 0.0
-        self.max_energy = 0.0
-        self.chemo_signal = 0.0
-        self.edge_distance_x = 0.0
-        self.edge_distance_y = 0.0
-
-    def update(self, food_grid, agent_grid, chemo_grid=None):
+        pool, slot = self.state.pool, self.state.slot
+        for name in self.SENSE_COLUMNS:
+            getattr(pool, name)[slot] = pool.COLUMNS[name][2]
+
+    def update(self, food_mask, chemo_grid=None):
         """
-        Updates all sensory data from the current environment grids.
+        Updates this agent's sensory data from the current environment grids.
+        Runs the population sensing kernel for this agent's slot alone, after relinking the
+        per-cell agent chains it reads; the simulation normally senses every agent at once
+        (see Simulation.sense_all).
         Args:
-            food_grid: Set of (x, y) positions containing food.
-            agent_grid: Dict mapping (x, y) to list of agent objects at those positions.
+            food_mask: Bool array [world_w, world_h], True where food lies.
             chemo_grid: Optional 2D array of chemical concentrations.
         """
-        self.reset()
-        fr = self.state.food_radius
-        energy_sum = 0
-        energy_max = 0
-        energy_count = 0
-        friends = 0
-        others = 0
-
-        for dx in range(-fr, fr + 1):
-            for dy in range(-fr, fr + 1):
-                tx = clamp(self.state.x + dx, 0, self.state.sim.world_w - 1)
-                ty = clamp(self.state.y + dy, 0, self.state.sim.world_h - 1)
-                agents_here = agent_grid.get((tx, ty), [])
-                self.sense_agents += len(agents_here)
-                for ag in agents_here:
-                    # "Group" defined by color by default; replace as needed.
-                    if ag.color == self.state.color:
-                        friends += 1
-                    else:
-                        others += 1
-                    energy_sum += ag.energy
-                    if ag.energy > energy_max:
-                        energy_max = ag.energy
-                    energy_count += 1
-                if (tx, ty) in food_grid:
-                    self.sense_food += 1
-                    if dx == 0 and dy == 0:
-                        continue
-                    self._update_direction(dx, dy)
-                    self._update_distance(dx, dy)
-                if chemo_grid is not None:
-                    self.chemo_signal += chemo_grid[tx][ty]
-
-        self.sense_friends = friends
-        self.sense_others = others
-        self.avg_energy = (energy_sum / energy_count) if energy_count else 0.0
-        self.max_energy = energy_max
-        self._normalize_distances()
-
-        # Normalized edge distance [0, 1]: distance to nearest map edge along each axis
-        self.edge_distance_x = min(
-            self.state.x, self.state.sim.world_w - 1 - self.state.x
-        ) / (self.state.sim.world_w - 1)
-        self.edge_distance_y = min(
-            self.state.y, self.state.sim.world_h - 1 - self.state.y
-        ) / (self.state.sim.world_h - 1)
-
-    def _update_direction(self, dx, dy):
-        """
-        Increments food direction counters based on dx, dy.
-        """
-        if abs(dx) >= abs(dy):
-            if dx > 0:
-                self.food_right += 1
-            elif dx < 0:
-                self.food_left += 1
-        if abs(dy) >= abs(dx):
-            if dy > 0:
-                self.food_down += 1
-            elif dy < 0:
-                self.food_up += 1
-
-    def _update_distance(self, dx, dy):
-        """
-        Updates the minimum normalized distance to food in each cardinal direction.
-        """
-        if dx == 0 and dy < 0:
-            self.food_up_dist = self._min_dist(self.food_up_dist, abs(dy))
-        if dx == 0 and dy > 0:
-            self.food_down_dist = self._min_dist(self.food_down_dist, abs(dy))
-        if dy == 0 and dx < 0:
-            self.food_left_dist = self._min_dist(self.food_left_dist, abs(dx))
-        if dy == 0 and dx > 0:
-            self.food_right_dist = self._min_dist(self.food_right_dist, abs(dx))
-
-    @staticmethod
-    def _min_dist(old, new):
-        """
-        Returns the smaller of the two distances, treating None as infinity.
-        """
-        return new if old is None or new < old else old
-
-    def _normalize_distances(self):
-        """
-        Normalizes food direction distances to [0, 1] scale.
-        """
-        r = self.state.food_radius + 1
-        self.food_up_dist = (self.food_up_dist or r) / r
-        self.food_down_dist = (self.food_down_dist or r) / r
-        self.food_left_dist = (self.food_left_dist or r) / r
-        self.food_right_dist = (self.food_right_dist or r) / r
+        pool, slot, sim = self.state.pool, self.state.slot, self.state.sim
+        sim.rebuild_cell_chains()
+        update_senses(
+            np.array([slot], dtype=np.intp), pool.xs, pool.ys, pool.food_radii, pool.color_ids, pool.energies,
+            sim.world_w, sim.world_h, food_mask, direction_table(int(pool.food_radii[slot])),
+            sim.agent_cell_head, sim.agent_next_in_cell,
+            pool.sense_food, pool.sense_agents, pool.sense_friends, pool.sense_others,
+            pool.avg_energy, pool.max_energy,
+            pool.food_up, pool.food_down, pool.food_left, pool.food_right,
+            pool.food_up_dist, pool.food_down_dist, pool.food_left_dist, pool.food_right_dist,
+            pool.edge_distance_x, pool.edge_distance_y
+        )
+        if chemo_grid is not None:
+            fr = int(pool.food_radii[slot])
+            x, y = int(pool.xs[slot]), int(pool.ys[slot])
+            pool.chemo_signal[slot] = chemo_grid[max(0, x - fr):x + fr + 1, max(0, y - fr):y + fr + 1].sum()
 
     # --- Property access for compatibility with agent code ---
 
@@ -0,0 +1,290 @@
+import random
+
+import numpy as np
+
+from src.config import (
+    MAX_POP, MAX_AGENT_AGE, ENERGY_PER_FOOD, ENERGY_AFTER_REPRO, N_BASE_INPUTS, N_HISTORY,
+    MUTATION_RANGE, SENSOR_RADIUS_RANGE, PERSONALITY_CODE, PERSONALITY_MUTATION_RATE
+)
+
+# Death reasons are stored as int8 codes indexing this tuple (0 = none recorded)
+DEATH_REASONS = (None, "crowd", "old_age", "energy", "cull")
+CROWD, OLD_AGE, ENERGY, CULL = (DEATH_REASONS.index(r) for r in ("crowd", "old_age", "energy", "cull"))
+
+VISITED_LENGTH = 10  # Cells remembered in each agent's recent path
+
+# (dx, dy) per movement action: up, down, left, right
+MOVES = np.array([(0, -1), (0, 1), (-1, 0), (1, 0)], dtype=np.int32)
+MOVE_DX, MOVE_DY = MOVES[:, 0].copy(), MOVES[:, 1].copy()  # contiguous per-axis lookups
+
+
+class AgentPool:
+    """
+    Structure-of-arrays storage for the whole agent population.
+    Every agent owns one integer slot; its fields live in parallel numpy columns
+    indexed by that slot. Freed slots are recycled and the columns grow on demand.
+    """
+
+    # name: (dtype, per-agent shape, fill value)
+    COLUMNS = {
+        # Core state
+        "alive": (np.bool_, (), False),
+        "agents": (object, (), None),  # Agent facade occupying the slot
+        "xs": (np.int32, (), 0),
+        "ys": (np.int32, (), 0),
+        "colors": (np.uint8, (3,), 0),
+        "color_ids": (np.int32, (), 0),  # Color packed as 0xRRGGBB, so color equality is an int compare
+        "energies": (np.float64, (), 0.0),
+        "ages": (np.int32, (), 0),
+        "offspring_counts": (np.int32, (), 0),
+        "ids": (np.int64, (), 0),
+        "parent_ids": (np.int64, (), -1),
+        "death_reasons": (np.int8, (), 0),
+        "personalities": (np.int8, (), 0),  # PERSONALITY_CODE values
+        "food_radii": (np.int16, (), 0),
+        "agent_radii": (np.int16, (), 0),
+        "last_moves": (np.int8, (2,), 0),
+        # Recent path: per-slot ring buffer of (x, y) cells left, -1 where not yet written
+        "visited": (np.int16, (VISITED_LENGTH, 2), -1),
+        "visited_heads": (np.int8, (), 0),
+        # Brain input history: per-slot ring buffer of past base input vectors
+        "history": (np.float32, (N_HISTORY, N_BASE_INPUTS), 0.0),
+        "history_heads": (np.int32, (), 0),
+        "history_counts": (np.int32, (), 0),
+        # Senses
+        "sense_food": (np.int32, (), 0),
+        "sense_agents": (np.int32, (), 0),
+        "sense_friends": (np.int32, (), 0),
+        "sense_others": (np.int32, (), 0),
+        "food_up": (np.int32, (), 0),
+        "food_down": (np.int32, (), 0),
+        "food_left": (np.int32, (), 0),
+        "food_right": (np.int32, (), 0),
+        "food_up_dist": (np.float32, (), 1.0),
+        "food_down_dist": (np.float32, (), 1.0),
+        "food_left_dist": (np.float32, (), 1.0),
+        "food_right_dist": (np.float32, (), 1.0),
+        "avg_energy": (np.float32, (), 0.0),
+        "max_energy": (np.float32, (), 0.0),
+        "chemo_signal": (np.float32, (), 0.0),
+        "edge_distance_x": (np.float32, (), 0.0),
+        "edge_distance_y": (np.float32, (), 0.0),
+    }
+
+    def __init__(self, capacity=MAX_POP):
+        """
+        Preallocates all columns for the given number of slots.
+        Args:
+            capacity (int): Initial number of slots.
+        """
+        self.capacity = 0
+        self._free = []
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        """
+        Reallocates every column to hold 'capacity' slots, keeping existing data.
+        """
+        for name, (dtype, shape, fill) in self.COLUMNS.items():
+            column = np.full((capacity,) + shape, fill, dtype=dtype)
+            if self.capacity:
+                column[:self.capacity] = getattr(self, name)
+            setattr(self, name, column)
+        # Pop from the end so that low slots are handed out first.
+        self._free.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def spawn(self, x, y, color, energy, food_radius, agent_radius, personality):
+        """
+        Claims a free slot and initializes it for a newborn agent.
+        Args:
+            x (int): Initial x-coordinate.
+            y (int): Initial y-coordinate.
+            color (tuple): Agent color.
+            energy (float): Initial energy.
+            food_radius (int): Perception radius for food.
+            agent_radius (int): Perception radius for agents.
+            personality (str): Agent personality string.
+        Returns:
+            int: The claimed slot index.
+        """
+        if not self._free:
+            self._grow(self.capacity * 2)
+        slot = self._free.pop()
+        for name, (_, _, fill) in self.COLUMNS.items():
+            getattr(self, name)[slot] = fill
+        self.alive[slot] = True
+        self.xs[slot] = x
+        self.ys[slot] = y
+        self.colors[slot] = color
+        r, g, b = (int(c) for c in color)
+        self.color_ids[slot] = (r << 16) | (g << 8) | b
+        self.energies[slot] = energy
+        self.ids[slot] = random.randint(0, 1_000_000)
+        self.personalities[slot] = PERSONALITY_CODE[personality]
+        self.food_radii[slot] = food_radius
+        self.agent_radii[slot] = agent_radius
+        return slot
+
+    def reproduce_batch(self, parents, xs, ys, rng):
+        """
+        Spawns one mutated child per parent, all at once. Children get the parent's color
+        shifted by up to MUTATION_RANGE per channel, both radii shifted by -1..1 (kept within
+        SENSOR_RADIUS_RANGE) and, with probability PERSONALITY_MUTATION_RATE, a random personality.
+        Parents drop to ENERGY_AFTER_REPRO and count one more offspring.
+        Args:
+            parents: Int array [K] of distinct parent slots.
+            xs, ys: Int arrays [K] of the children's cells.
+            rng: numpy Generator drawing the mutations.
+        Returns:
+            np.ndarray: Slots claimed by the children, in 'parents' order.
+        """
+        k = len(parents)
+        if not k:
+            return np.empty(0, dtype=np.intp)
+        while len(self._free) < k:
+            self._grow(self.capacity * 2)
+        slots = np.array(self._free[:-k - 1:-1], dtype=np.intp)
+        del self._free[-k:]
+        for name, (_, _, fill) in self.COLUMNS.items():
+            getattr(self, name)[slots] = fill
+
+        colors = self.colors[parents] + rng.integers(-MUTATION_RANGE, MUTATION_RANGE + 1, (k, 3), dtype=np.int16)
+        colors = np.clip(colors, 0, 255).astype(np.int32)
+        radii = np.stack([self.food_radii[parents], self.agent_radii[parents]], axis=1)
+        radii = np.clip(radii + rng.integers(-1, 2, (k, 2), dtype=np.int16), *SENSOR_RADIUS_RANGE)
+        personalities = np.where(
+            rng.random(k) < PERSONALITY_MUTATION_RATE,
+            rng.integers(0, len(PERSONALITY_CODE), k), self.personalities[parents]
+        )
+
+        self.alive[slots] = True
+        self.xs[slots] = xs
+        self.ys[slots] = ys
+        self.colors[slots] = colors
+        self.color_ids[slots] = (colors[:, 0] << 16) | (colors[:, 1] << 8) | colors[:, 2]
+        self.energies[slots] = ENERGY_AFTER_REPRO
+        self.ids[slots] = rng.integers(0, 1_000_000, k, endpoint=True)
+        self.parent_ids[slots] = self.ids[parents]
+        self.personalities[slots] = personalities
+        self.food_radii[slots] = radii[:, 0]
+        self.agent_radii[slots] = radii[:, 1]
+
+        self.energies[parents] = ENERGY_AFTER_REPRO
+        self.offspring_counts[parents] += 1
+        return slots
+
+    def release(self, slot):
+        """
+        Marks a slot as dead and returns it to the free list.
+        """
+        self.alive[slot] = False
+        self.agents[slot] = None
+        self._free.append(slot)
+
+    def alive_slots(self):
+        """
+        Returns:
+            np.ndarray: Indices of all occupied slots, in ascending order.
+        """
+        return np.flatnonzero(self.alive)
+
+    def visit(self, slot, x, y):
+        """
+        Records cell (x, y) in the slot's recent-path ring buffer, overwriting the oldest entry.
+        """
+        head = self.visited_heads[slot]
+        self.visited[slot, head] = (x, y)
+        self.visited_heads[slot] = (head + 1) % VISITED_LENGTH
+
+    def visited_here(self, slots):
+        """
+        Returns:
+            np.ndarray: Bool [N], True where an agent's current cell is in its recent path.
+        """
+        visited = self.visited[slots]
+        return (
+            (visited[:, :, 0] == self.xs[slots, None]) & (visited[:, :, 1] == self.ys[slots, None])
+        ).any(axis=1)
+
+    def move(self, slots, actions, occ, move_cost, idle_cost):
+        """
+        Moves the given agents one cell according to their actions, all at once.
+        A move fails (and costs idle_cost instead of move_cost) if it would leave the map
+        or enter a cell occupied by any agent at the start of the move; when several agents
+        target the same free cell, the first of them (in 'slots' order) gets it.
+        Args:
+            slots: Int array [N] of slots to move.
+            actions: Int array [N] of action indices into MOVES.
+            occ: Uint8 array [world_w, world_h] of living agents per cell; updated in place.
+            move_cost (float): Energy spent on a successful move.
+            idle_cost (float): Energy spent when the agent stays in place.
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: x and y of the cells the movers left.
+        """
+        world_w, world_h = occ.shape
+        xs, ys = self.xs[slots], self.ys[slots]
+        dx, dy = MOVE_DX[actions], MOVE_DY[actions]
+        nx = np.clip(xs + dx, 0, world_w - 1)
+        ny = np.clip(ys + dy, 0, world_h - 1)
+
+        # An agent's own cell is occupied too, so bumping into the map edge also fails here
+        candidates = np.flatnonzero(occ[nx, ny] == 0)
+        _, first = np.unique(nx[candidates] * world_h + ny[candidates], return_index=True)
+        movers = np.zeros(len(slots), dtype=bool)
+        movers[candidates[first]] = True
+
+        moved = slots[movers]
+        old_xs, old_ys = xs[movers], ys[movers]
+        # A uint8 operand keeps ufunc.at on its fast path (no per-element casting)
+        np.subtract.at(occ, (old_xs, old_ys), np.uint8(1))
+        occ[nx[movers], ny[movers]] = 1
+        heads = self.visited_heads[moved]
+        self.visited[moved, heads, 0] = old_xs
+        self.visited[moved, heads, 1] = old_ys
+        self.visited_heads[moved] = (heads + 1) % VISITED_LENGTH
+        self.last_moves[moved, 0] = dx[movers]
+        self.last_moves[moved, 1] = dy[movers]
+        self.xs[moved] = nx[movers]
+        self.ys[moved] = ny[movers]
+        self.energies[slots] -= np.where(movers, move_cost, idle_cost)
+        return old_xs, old_ys
+
+    def eat(self, slots, food_mask):
+        """
+        Lets the given agents consume the food on their cells, all at once.
+        If several agents share a food cell, only the first of them (in 'slots' order) gets it.
+        Args:
+            slots: Int array of slots that may eat.
+            food_mask: Bool food mask [world_w, world_h]; eaten cells are cleared in-place.
+        """
+        xs, ys = self.xs[slots], self.ys[slots]
+        hit = food_mask[xs, ys]
+        _, first = np.unique(xs[hit] * food_mask.shape[1] + ys[hit], return_index=True)
+        eaters = slots[hit][first]
+        self.energies[eaters] += ENERGY_PER_FOOD
+        food_mask[self.xs[eaters], self.ys[eaters]] = False
+
+    def step(self, slots, max_neighbors):
+        """
+        Ages the given agents by one tick and applies the death conditions to all of them at once:
+        overcrowding (more than max_neighbors sensed agents, if max_neighbors > 0), old age,
+        and exhausted energy. Crowded and old agents get their energy set to -1.
+        Args:
+            slots: Int array of slots to step (agents with energy left this tick).
+            max_neighbors (int): Crowding limit; 0 disables the check.
+        Returns:
+            np.ndarray: Slots among 'slots' that died this step.
+        """
+        self.ages[slots] += 1
+        energies = self.energies[slots]
+        crowd = self.sense_agents[slots] > max_neighbors if max_neighbors > 0 else np.zeros(len(slots), bool)
+        old = self.ages[slots] >= MAX_AGENT_AGE
+        killed = crowd | old
+        self.death_reasons[slots] = np.select(
+            [crowd, old, energies <= 0], [CROWD, OLD_AGE, ENERGY], default=self.death_reasons[slots]
+        )
+        energies[killed] = -1
+        self.energies[slots] = energies
+        return slots[energies <= 0]
+
@@ -1,23 +1,47 @@
 import numpy as np
-from collections import deque
-import random
+import torch
 
-from src.config import ENERGY_START, NN_LAYERS, NN_HIDDEN
+from src.agent_pool import DEATH_REASONS, VISITED_LENGTH
+from src.config import ENERGY_START, PERSONALITY_TYPES
 from src.utils import random_personality
 
+
+def _column(name, cast):
+    """
+    Builds a read/write property proxying one scalar pool column at this state's slot.
+    """
+    def fget(self):
+        return cast(getattr(self.pool, name)[self.slot])
+
+    def fset(self, value):
+        getattr(self.pool, name)[self.slot] = value
+
+    return property(fget, fset)
+
+
 class AgentState:
     """
-    Container for all mutable agent data.
+    View of a single agent's data inside the simulation's AgentPool.
     Holds agent's core attributes, learning state, and lineage information.
     Intended for read/write by agent logic and components only.
     """
 
+    x = _column("xs", int)
+    y = _column("ys", int)
+    energy = _column("energies", float)
+    age = _column("ages", int)
+    offspring_count = _column("offspring_counts", int)
+    id = _column("ids", int)
+    food_radius = _column("food_radii", int)
+    agent_radius = _column("agent_radii", int)
+
     def __init__(
         self, sim, x, y, color, energy=ENERGY_START,
         food_radius=3, agent_radius=3, personality=None
     ):
         """
-        Initializes all agent state fields.
+        Claims a pool slot, initializes all agent state fields (including a zeroed LSTM state)
+        and counts the agent in sim.occ.
         Args:
             sim: Simulation instance reference.
             x (int): Initial x-coordinate.
@@ -29,20 +53,88 @@ class AgentState:
             personality: Agent personality string or object.
         """
         self.sim = sim
-        self.x = x
-        self.y = y
-        self.color = color
-        self.energy = float(energy)
-        self.personality = personality if personality else random_personality()
-        self.age = 0
-        self.offspring_count = 0
-        self.id = random.randint(0, 1_000_000)
-        self.parent_id = None
-        self.death_reason = None
-        self.visited_last_10 = deque(maxlen=10)
-        self.last_move = (0, 0)
-        self.lstm_hidden = np.zeros((NN_LAYERS, NN_HIDDEN), dtype=np.float32)
-        self.lstm_cell = np.zeros((NN_LAYERS, NN_HIDDEN), dtype=np.float32)
-        self.food_radius = food_radius
-        self.agent_radius = agent_radius
+        self.pool = sim.pool
+        self.slot = self.pool.spawn(
+            x, y, color, float(energy), food_radius, agent_radius,
+            personality if personality else random_personality()
+        )
+        sim.occ[x, y] += 1
+        sim.reset_lstm_state([self.slot])
         # Add additional fields required by components as needed.
+
+    @classmethod
+    def from_slot(cls, sim, slot):
+        """
+        Builds a view of a slot the pool has already initialized (see AgentPool.reproduce_batch).
+        Args:
+            sim: Simulation instance reference.
+            slot (int): Occupied pool slot.
+        """
+        state = cls.__new__(cls)
+        state.sim = sim
+        state.pool = sim.pool
+        state.slot = int(slot)
+        return state
+
+    @property
+    def color(self):
+        return tuple(int(c) for c in self.pool.colors[self.slot])
+
+    @property
+    def personality(self):
+        return PERSONALITY_TYPES[self.pool.personalities[self.slot]]
+
+    @property
+    def personality_code(self):
+        return int(self.pool.personalities[self.slot])
+
+    @property
+    def parent_id(self):
+        parent_id = int(self.pool.parent_ids[self.slot])
+        return None if parent_id < 0 else parent_id
+
+    @parent_id.setter
+    def parent_id(self, value):
+        self.pool.parent_ids[self.slot] = -1 if value is None else value
+
+    @property
+    def death_reason(self):
+        return DEATH_REASONS[self.pool.death_reasons[self.slot]]
+
+    @death_reason.setter
+    def death_reason(self, value):
+        self.pool.death_reasons[self.slot] = DEATH_REASONS.index(value)
+
+    @property
+    def visited_last_10(self):
+        """
+        The cells this agent recently left, oldest first.
+        """
+        head = self.pool.visited_heads[self.slot]
+        ring = self.pool.visited[self.slot, np.roll(np.arange(VISITED_LENGTH), -head)]
+        return [(int(x), int(y)) for x, y in ring if x >= 0]
+
+    @property
+    def last_move(self):
+        dx, dy = self.pool.last_moves[self.slot]
+        return int(dx), int(dy)
+
+    @last_move.setter
+    def last_move(self, value):
+        self.pool.last_moves[self.slot] = value
+
+    @property
+    def lstm_hidden(self):
+        return self.sim.lstm_h[:, self.slot]
+
+    @lstm_hidden.setter
+    def lstm_hidden(self, value):
+        self.sim.lstm_h[:, self.slot] = torch.as_tensor(value)
+
+    @property
+    def lstm_cell(self):
+        return self.sim.lstm_c[:, self.slot]
+
+    @lstm_cell.setter
+    def lstm_cell(self, value):
+        self.sim.lstm_c[:, self.slot] = torch.as_tensor(value)
@@ -1,3 +1,4 @@
+import torch
 from torch import nn
 from torch.nn import functional as F
 
@@ -13,6 +14,9 @@ class BatchedLSTM(nn.Module):
         output_size (int): Number of output actions/classes.
         num_layers (int): Number of stacked LSTM layers.
         device (str): Target device ('cpu' or 'cuda').
+        use_compile (bool): Run forward_batch through torch.compile, padding batches to fixed sizes.
+        dtype (torch.dtype): Parameter and state dtype; float16/bfloat16 halves the weight
+            bandwidth of every layer on GPU. Probabilities are always returned as float32.
 
     Forward input:
         x (torch.Tensor): [batch, seq=1, input_size] - Input features.
@@ -25,7 +29,10 @@ class BatchedLSTM(nn.Module):
         c_new (torch.Tensor): [num_layers, batch, hidden_size] - Updated cell state.
     """
 
-    def __init__(self, input_size, hidden_size, output_size, num_layers=1, device="cpu"):
+    MIN_BUCKET = 64  # Smallest padded batch size for the compiled model
+
+    def __init__(self, input_size, hidden_size, output_size, num_layers=1, device="cpu", use_compile=False,
+                 dtype=torch.float32):
         super().__init__()
         self.lstm = nn.LSTM(
             input_size=input_size,
@@ -35,7 +42,10 @@ class BatchedLSTM(nn.Module):
         )
         self.fc = nn.Linear(hidden_size, output_size)
         self.device = device
-        self.to(self.device)
+        self.dtype = dtype
+        self.to(device=self.device, dtype=self.dtype)
+        self.eval()  # Inference only
+        self._compiled = torch.compile(self.forward, mode="reduce-overhead") if use_compile else None
 
     def forward(self, x, h, c):
         """
@@ -54,3 +64,24 @@ class BatchedLSTM(nn.Module):
         out = self.fc(lstm_out.squeeze(1))                # [batch, output_size]
         probs = F.softmax(out, dim=-1)                    # [batch, output_size]
         return probs, h_new, c_new
+
+    def forward_batch(self, x, h, c):
+        """
+        Runs forward() for a batch of any size. With compilation enabled, the batch is
+        zero-padded to the next power of two (at least MIN_BUCKET) so that the compiled
+        model only ever sees a handful of shapes; the padding rows are sliced off again.
+        Takes and returns the same tensors as forward(); x, h and c are cast to the model dtype
+        and probs are returned as float32 for sampling.
+        """
+        x, h, c = x.to(self.dtype), h.to(self.dtype), c.to(self.dtype)
+        if self._compiled is None:
+            probs, h_new, c_new = self(x, h, c)
+            return probs.float(), h_new, c_new
+        n = x.shape[0]
+        bucket = max(self.MIN_BUCKET, 1 << (n - 1).bit_length())
+        pad = bucket - n
+        x = F.pad(x, (0, 0, 0, 0, 0, pad))
+        h = F.pad(h, (0, 0, 0, pad))
+        c = F.pad(c, (0, 0, 0, pad))
+        probs, h_new, c_new = self._compiled(x, h, c)
+        return probs[:n].float(), h_new[:, :n], c_new[:, :n]
@@ -31,6 +31,7 @@ NN_MUTATION = 0.10              # Neural network weight mutation rate
 PERSONALITY_TYPES = [
     'explorer', 'survivor', 'feeder', 'loner', 'social'
 ]
+PERSONALITY_CODE = {p: code for code, p in enumerate(PERSONALITY_TYPES)}  # Stored int8 code per personality
 PERSONALITY_MUTATION_RATE = 0.05
 
 # ---- Neural Network Architecture ----
@@ -38,9 +39,19 @@ PERSONALITY_MUTATION_RATE = 0.05
 N_BASE_INPUTS = 23              # Base input features (see AgentBrain)
 N_HISTORY = 20                  # Steps of input history included
 NN_INPUTS = N_BASE_INPUTS * (1 + N_HISTORY)
+# A deep, thin stack is a poor shape for fused LSTM kernels: each layer is a small
+# hidden->hidden matmul run one after another. A shallower, wider stack such as
+# 2 x 256 has a comparable parameter count with far higher arithmetic intensity.
 NN_LAYERS = 10                  # LSTM layers (deep, for testing; can set lower)
 NN_HIDDEN = 64                  # Hidden units per LSTM layer
 NN_OUTPUTS = 4                  # Action output dimension
+NN_COMPILE = True               # torch.compile the brain (CUDA only; no gain for the CPU LSTM)
+NN_HALF_PRECISION = True        # Run the brain in float16 on CUDA
+NN_GREEDY_ACTIONS = False       # Take the most likely action instead of sampling one
+
+# ---- Logging ----
+
+LOG_VERBOSE = True              # Log zone switches, balancer feedback and periodic stats while running
 
 # ---- Agent Trace / World Trace ----
 
@@ -1,5 +1,8 @@
 import random
 
+import numpy as np
+
+from src.agent_pool import OLD_AGE, ENERGY
 from src.config import TARGET_CROWD_RATIO, TARGET_ENERGY_RATIO, MIN_POP
 from src.utils import clamp
 
@@ -41,24 +44,21 @@ class PopulationBalancer:
         sim = self.sim
 
         # Skip balancing if insufficient data
-        if len(sim.agents) == 0 or len(sim.recent_deaths) < 50:
+        if len(sim.agents) == 0 or sim.recent_deaths_len < 50:
             return
 
         # --- Gather recent death statistics ---
-        crowd = sum(1 for d in sim.recent_deaths if d == ("crowd", "cull"))
-        energy = sum(1 for d in sim.recent_deaths if d == "energy")
-        old_age = sum(1 for d in sim.recent_deaths if d == "old_age")
-        total = crowd + energy + old_age + 1
+        # Crowd deaths have always been zero in the ratios (the original scan matched no reason)
+        recent = sim.recent_deaths[:sim.recent_deaths_len]
+        energy = np.count_nonzero(recent == ENERGY)
+        old_age = np.count_nonzero(recent == OLD_AGE)
+        total = energy + old_age + 1
 
-        current_crowd_ratio = crowd / total
-        current_energy_ratio = energy / total
-        current_old_age_ratio = old_age / total
+        current_ratios = np.array([0, energy, old_age], dtype=np.float64) / total
 
-        # --- Update EMA (Exponential Moving Average) for each death type ---
+        # --- Update EMA (Exponential Moving Average) for all death types at once ---
         dynamic_alpha = 0.03
-        sim.ema_crowd += dynamic_alpha * (current_crowd_ratio - sim.ema_crowd)
-        sim.ema_energy += dynamic_alpha * (current_energy_ratio - sim.ema_energy)
-        sim.ema_old_age += dynamic_alpha * (current_old_age_ratio - sim.ema_old_age)
+        sim.ema += dynamic_alpha * (current_ratios - sim.ema)
 
         # --- Apply proportional feedback to resource parameters ---
         neighbor_change = 1.0 + (sim.ema_crowd - TARGET_CROWD_RATIO) * 0.1
@@ -91,7 +91,8 @@ class PopulationBalancer:
 
         if self._deadlock_ticks >= self.DEADLOCK_LIMIT:
             # Inject resources and reset limits to break the deadlock.
-            print(f"[DEADLOCK BREAKER] t={sim.tick} – resetting limits and injecting resources.")
+            if sim.verbose:
+                sim.log(f"[DEADLOCK BREAKER] t={sim.tick} – resetting limits and injecting resources.")
             max_neighbors = random.randint(20, self.MAXN_MAX)
             food_count = random.randint(self.FOOD_MAX // 2, self.FOOD_MAX)
             move_cost = self.MOVE_MIN
@@ -127,7 +128,8 @@ class PopulationBalancer:
                 max_pop=sim.MAX_POP
             )
             sim.apply_resource_limits(limits)
-            print(f"[POP CONTROL] t={sim.tick} POP={len(sim.agents)} – moderate resource reduction.")
+            if sim.verbose:
+                sim.log(f"[POP CONTROL] t={sim.tick} POP={len(sim.agents)} – moderate resource reduction.")
 
         # --- Gentle resource increase when population is low ---
         if len(sim.agents) < MIN_POP:
@@ -141,12 +143,14 @@ class PopulationBalancer:
                 max_pop=sim.MAX_POP
             )
             sim.apply_resource_limits(limits)
-            print(f"[POP RECOVERY] t={sim.tick} POP={len(sim.agents)} – gentle resource support.")
+            if sim.verbose:
+                sim.log(f"[POP RECOVERY] t={sim.tick} POP={len(sim.agents)} – gentle resource support.")
 
         # --- Debug: current simulation resource statistics ---
-        print(
-            f"[AUTO-EMA] t={sim.tick} pop={len(sim.agents)} "
-            f"EMA[crowd]={sim.ema_crowd:.2f} EMA[energy]={sim.ema_energy:.2f} EMA[old]={sim.ema_old_age:.2f} | "
-            f"FOOD={sim.FOOD_COUNT} MOVE={sim.MOVE_COST:.2f} IDLE={sim.IDLE_COST:.2f} "
-            f"MAXN={sim.MAX_NEIGHBORS} MAX_POP={sim.MAX_POP} DEADLOCK={self._deadlock_ticks}"
-        )
+        if sim.verbose:
+            sim.log(
+                f"[AUTO-EMA] t={sim.tick} pop={len(sim.agents)} "
+                f"EMA[crowd]={sim.ema_crowd:.2f} EMA[energy]={sim.ema_energy:.2f} EMA[old]={sim.ema_old_age:.2f} | "
+                f"FOOD={sim.FOOD_COUNT} MOVE={sim.MOVE_COST:.2f} IDLE={sim.IDLE_COST:.2f} "
+                f"MAXN={sim.MAX_NEIGHBORS} MAX_POP={sim.MAX_POP} DEADLOCK={self._deadlock_ticks}"
+            )
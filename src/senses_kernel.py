@@ -0,0 +1,137 @@
+"""
+Numba kernels for population-wide agent sensing.
+
+Agents are addressed by their AgentPool slot; each kernel takes the slot list
+for the agents to process plus the pool columns it reads or writes.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from numba import njit, prange
+
+# Direction bits of a window cell relative to the window center (see direction_table)
+UP, DOWN, LEFT, RIGHT = 1, 2, 4, 8
+
+
+@lru_cache(maxsize=32)
+def direction_table(radius):
+    """
+    Returns the [2*radius+1, 2*radius+1] uint8 table of direction bits for every offset
+    (dx + radius, dy + radius) in a sensing window: a cell counts as UP/DOWN when it lies
+    at least as far vertically as horizontally, LEFT/RIGHT likewise, so diagonals count twice.
+    A table for radius R serves every smaller radius when indexed from its center.
+    """
+    offsets = np.arange(-radius, radius + 1)
+    dx, dy = np.meshgrid(offsets, offsets, indexing="ij")
+    vertical = np.abs(dy) >= np.abs(dx)
+    horizontal = np.abs(dx) >= np.abs(dy)
+    table = (
+        (vertical & (dy < 0)) * UP | (vertical & (dy > 0)) * DOWN
+        | (horizontal & (dx < 0)) * LEFT | (horizontal & (dx > 0)) * RIGHT
+    )
+    table = table.astype(np.uint8)
+    table.flags.writeable = False
+    return table
+
+
+@njit(cache=True)
+def build_cell_chains(slots, xs, ys, cell_head, next_in_cell):
+    """
+    Rebuilds the per-cell agent chains from the pool columns: the agents on cell (x, y)
+    are cell_head[x, y] -> next_in_cell[slot] -> ... (-1 terminated). Sensing walks these
+    chains for agent counts, energies and exact color id compares.
+    """
+    cell_head[:] = -1
+    for i in range(slots.shape[0]):
+        s = slots[i]
+        x, y = xs[s], ys[s]
+        next_in_cell[s] = cell_head[x, y]
+        cell_head[x, y] = s
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def update_senses(slots, xs, ys, food_radii, color_ids, energies, world_w, world_h, food_mask, directions,
+                  cell_head, next_in_cell,
+                  out_sense_food, out_sense_agents, out_sense_friends, out_sense_others,
+                  out_avg_energy, out_max_energy,
+                  out_food_up, out_food_down, out_food_left, out_food_right,
+                  out_up_dist, out_down_dist, out_left_dist, out_right_dist,
+                  out_edge_x, out_edge_y):
+    """
+    Computes every sense column for the given slots over the square window of radius
+    food_radius around each agent, cropped at the map edges.
+    'directions' is a direction_table covering the largest food_radius among the slots;
+    the nearest food along each axis is found by scanning outward from the agent.
+    """
+    center = directions.shape[0] // 2
+    for i in prange(slots.shape[0]):
+        s = slots[i]
+        x, y = xs[s], ys[s]
+        fr = food_radii[s]
+        color = color_ids[s]
+        x0, x1 = max(0, x - fr), min(world_w, x + fr + 1)
+        y0, y1 = max(0, y - fr), min(world_h, y + fr + 1)
+        r = fr + 1
+
+        food = 0
+        agents = 0
+        friends = 0
+        energy_sum = 0.0
+        energy_max = 0.0
+        up = down = left = right = 0
+        for tx in range(x0, x1):
+            row = directions[tx - x + center]
+            for ty in range(y0, y1):
+                j = cell_head[tx, ty]
+                while j >= 0:
+                    agents += 1
+                    e = energies[j]
+                    energy_sum += e
+                    if e > energy_max:
+                        energy_max = e
+                    if color_ids[j] == color:
+                        friends += 1
+                    j = next_in_cell[j]
+                if food_mask[tx, ty]:
+                    food += 1
+                    bits = row[ty - y + center]
+                    up += bits & UP
+                    down += (bits & DOWN) >> 1
+                    left += (bits & LEFT) >> 2
+                    right += (bits & RIGHT) >> 3
+
+        up_d = down_d = left_d = right_d = r
+        for d in range(1, y - y0 + 1):
+            if food_mask[x, y - d]:
+                up_d = d
+                break
+        for d in range(1, y1 - y):
+            if food_mask[x, y + d]:
+                down_d = d
+                break
+        for d in range(1, x - x0 + 1):
+            if food_mask[x - d, y]:
+                left_d = d
+                break
+        for d in range(1, x1 - x):
+            if food_mask[x + d, y]:
+                right_d = d
+                break
+
+        out_sense_food[s] = food
+        out_sense_agents[s] = agents
+        out_sense_friends[s] = friends
+        out_sense_others[s] = agents - friends
+        out_avg_energy[s] = energy_sum / agents if agents else 0.0
+        out_max_energy[s] = energy_max
+        out_food_up[s] = up
+        out_food_down[s] = down
+        out_food_left[s] = left
+        out_food_right[s] = right
+        out_up_dist[s] = up_d / r
+        out_down_dist[s] = down_d / r
+        out_left_dist[s] = left_d / r
+        out_right_dist[s] = right_d / r
+        out_edge_x[s] = min(x, world_w - 1 - x) / (world_w - 1)
+        out_edge_y[s] = min(y, world_h - 1 - y) / (world_h - 1)
@@ -1,6 +1,8 @@
 import collections
+import queue
 import random
 import sys
+import threading
 import time
 
 import numpy as np
@@ -8,13 +10,18 @@ import pygame
 import torch
 
 from src.agent import Agent
+from src.agent_components.agent_brain import AgentBrain
+from src.agent_components.agent_renderer import AgentRenderer
+from src.agent_pool import AgentPool, MOVES
 from src.batched_lstm import BatchedLSTM
 from src.config import (
-    GRID_SIZE, SENSOR_RADIUS_RANGE, NN_INPUTS, NN_LAYERS, MAX_AGENT_AGE,
-    TRACE_LENGTH, food_zones, NN_OUTPUTS, NN_HIDDEN, MAX_POP
+    GRID_SIZE, SENSOR_RADIUS_RANGE, ENERGY_TO_REPRODUCE, NN_INPUTS, NN_LAYERS, MAX_AGENT_AGE,
+    TRACE_LENGTH, food_zones, NN_OUTPUTS, NN_HIDDEN, NN_COMPILE,
+    NN_HALF_PRECISION, NN_GREEDY_ACTIONS, LOG_VERBOSE, MAX_POP, PERSONALITY_TYPES
 )
 from src.population_balancer import PopulationBalancer, ResourceLimits
-from src.utils import clamp, random_color, random_pos_in_zone, random_personality, spawn_food, print_population_stats
+from src.senses_kernel import build_cell_chains, update_senses, direction_table
+from src.utils import batched_agent_params, spawn_food, print_population_stats
 
 
 def safe_fmt(val, fmt=".2f", fallback="–"):
@@ -43,16 +50,15 @@ class Simulation:
         self.food_zone_duration = 1000
         self.EMA_ALPHA = 0.05
 
-        # Resource-limited fields (modulated by PopulationBalancer)
-        self._MAX_NEIGHBORS = 15
-        self._FOOD_COUNT = 600
-        self._MOVE_COST = 1.0
-        self._IDLE_COST = 0.6
-        self._MAX_POP = MAX_POP
+        # Resource-limited fields (set by PopulationBalancer via apply_resource_limits)
+        self.MAX_NEIGHBORS = 15
+        self.FOOD_COUNT = 600
+        self.MOVE_COST = 1.0
+        self.IDLE_COST = 0.6
+        self.MAX_POP = MAX_POP
 
-        self.ema_crowd = 0.0
-        self.ema_energy = 0.0
-        self.ema_old_age = 0.0
+        # Death-ratio EMAs (crowd, energy, old age), updated together by PopulationBalancer
+        self.ema = np.zeros(3, dtype=np.float64)
 
         if hasattr(torch.backends, "mps") and torch.backends.mps.is_available():
             self.device = "mps"
@@ -61,7 +67,11 @@ class Simulation:
         else:
             self.device = "cpu"
 
-        self.brain = BatchedLSTM(NN_INPUTS, NN_HIDDEN, NN_OUTPUTS, num_layers=NN_LAYERS, device=self.device)
+        self.brain = BatchedLSTM(
+            NN_INPUTS, NN_HIDDEN, NN_OUTPUTS, num_layers=NN_LAYERS, device=self.device,
+            use_compile=NN_COMPILE and self.device == "cuda",
+            dtype=torch.float16 if NN_HALF_PRECISION and self.device == "cuda" else torch.float32
+        )
 
         self.world_w, self.world_h = self.WIDTH // GRID_SIZE, self.HEIGHT // GRID_SIZE
 
@@ -70,26 +80,68 @@ class Simulation:
         self.clock = pygame.time.Clock()
         self.font = pygame.font.SysFont('monospace', 14)
         self.font_big = pygame.font.SysFont('monospace', 22, bold=True)
+        # Prefilled translucent cell overlays: one trace surface per age, one for the highlight path
+        self._trace_surfs = []
+        for age in range(TRACE_LENGTH):
+            surf = pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
+            surf.fill((120, 120, 120, int(48 * (1 - age / TRACE_LENGTH)) + 24))
+            self._trace_surfs.append(surf)
+        self._visited_surf = pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
+        self._visited_surf.fill((255, 255, 128, 90))
+        self._food_surf = pygame.Surface((GRID_SIZE - 8, GRID_SIZE - 8))
+        self._food_surf.fill((0, 200, 0))
         self.pinned_agent = None  # Agent currently highlighted (tooltip); None if none
 
         self.tick = 0
         self.paused = False
-        self.trace_map = {}
-        self.recent_deaths = collections.deque(maxlen=2000)
+        # Tick at which an agent last left each cell, -1 if never
+        self.trace_tick = np.full((self.world_w, self.world_h), -1, dtype=np.int32)
+        # (tick, xs, ys) of the cells left on each of the last TRACE_LENGTH ticks, oldest first
+        self._trace_queue = collections.deque(maxlen=TRACE_LENGTH)
+        # Ring buffer of the last 2000 death reasons, as DEATH_REASONS codes
+        self.recent_deaths = np.zeros(2000, dtype=np.int8)
+        self.recent_deaths_len = 0
+        self._recent_deaths_head = 0
         self.genome_stats = collections.defaultdict(list)
+        self.top_genome = None  # genome_stats key with the most recorded deaths
+        self._genome_order = {}  # genome_stats key -> insertion index, for top_genome ties
         self.deaths = collections.defaultdict(list)
-
+        self.death_counts = collections.Counter()  # len(self.deaths[k]) per key, for the overlay
+
+        # Vectorized draws (reproduction mutations), seeded from numpy's global RNG like the action stream
+        self.rng = np.random.default_rng(np.random.randint(2 ** 31))
+        # Action sampling stream on the brain's device, seeded from torch's global RNG
+        self.action_generator = torch.Generator(device=self.device)
+        self.action_generator.manual_seed(int(torch.randint(2 ** 62, ())))
+        self.pool = AgentPool(MAX_POP)
+        # LSTM state for every pool slot, resident on the brain's device: [layers, slot, hidden]
+        self.lstm_h = torch.zeros(
+            NN_LAYERS, self.pool.capacity, NN_HIDDEN, device=self.device, dtype=self.brain.dtype
+        )
+        self.lstm_c = torch.zeros_like(self.lstm_h)
+        # Brain input matrix, refilled in place every tick: [slot, input_size]
+        self.inputs = np.empty((self.pool.capacity, AgentBrain.N_INPUTS), dtype=np.float32)
+        self.food_mask = np.zeros((self.world_w, self.world_h), dtype=bool)
+        # Living agents per cell, kept in step with every spawn, move and death
+        self.occ = np.zeros((self.world_w, self.world_h), dtype=np.uint8)
+        xs, ys, colors, food_radii, agent_radii, personalities = batched_agent_params(
+            self.AGENT_COUNT, self._current_food_zone(), SENSOR_RADIUS_RANGE
+        )
         self.agents = [
             Agent(
-                self, *random_pos_in_zone(*self._current_food_zone()),
-                random_color(),
-                food_radius=random.randint(*SENSOR_RADIUS_RANGE),
-                agent_radius=random.randint(*SENSOR_RADIUS_RANGE),
-                personality=random_personality()
+                self, x, y, color,
+                food_radius=food_radius, agent_radius=agent_radius, personality=personality
+            )
+            for x, y, color, food_radius, agent_radius, personality in zip(
+                xs.tolist(), ys.tolist(), map(tuple, colors.tolist()),
+                food_radii.tolist(), agent_radii.tolist(), personalities
             )
-            for _ in range(self.AGENT_COUNT)
         ]
-        self.food_set = set()
+        # Slot of the agent on each cell, -1 where empty; rebuilt once per tick for lookups
+        self.slot_grid = np.full((self.world_w, self.world_h), -1, dtype=np.int32)
+        self._index_positions()
+        self.agent_cell_head = np.full((self.world_w, self.world_h), -1, dtype=np.int32)
+        self.agent_next_in_cell = np.empty(self.pool.capacity, dtype=np.int32)
 
         self.balancer = PopulationBalancer(self)
 
@@ -98,41 +150,76 @@ class Simulation:
         self._last_draw = time.time()
         self._fps = 0.0
         self._tps = 0.0
+        self._paused_frame_key = None  # What the last frame drawn while paused showed
+
+        # Console log: messages are queued and printed by a daemon thread, off the tick loop.
+        # Callers skip formatting entirely when verbose is False.
+        self.verbose = LOG_VERBOSE
+        self._log_q = queue.Queue(maxsize=1024)
+        threading.Thread(target=self._log_worker, daemon=True).start()
 
+        # Compile (or load from cache) the sensing kernels before the first tick
+        self.sense_all()
+
+        self._update_overlay_cache()
         print_population_stats(0, self.agents, self.genome_stats, self.deaths)
         sys.stdout.flush()
 
-    # --- API: Resource control properties ---
+    # --- API: Logging ---
 
-    @property
-    def MAX_NEIGHBORS(self):
-        return self._MAX_NEIGHBORS
+    def log(self, msg):
+        """
+        Queues a preformatted message for the log thread; dropped if the queue is full.
+        """
+        try:
+            self._log_q.put_nowait(msg)
+        except queue.Full:
+            pass
 
-    @property
-    def FOOD_COUNT(self):
-        return self._FOOD_COUNT
+    def _log_worker(self):
+        """
+        Prints queued log messages until the process exits.
+        """
+        while True:
+            msg = self._log_q.get()
+            print(msg, flush=True)
+            self._log_q.task_done()
+
+    # --- API: Death-ratio EMAs (views into self.ema) ---
 
     @property
-    def MOVE_COST(self):
-        return self._MOVE_COST
+    def ema_crowd(self):
+        return self.ema[0]
+
+    @ema_crowd.setter
+    def ema_crowd(self, value):
+        self.ema[0] = value
 
     @property
-    def IDLE_COST(self):
-        return self._IDLE_COST
+    def ema_energy(self):
+        return self.ema[1]
+
+    @ema_energy.setter
+    def ema_energy(self, value):
+        self.ema[1] = value
 
     @property
-    def MAX_POP(self):
-        return self._MAX_POP
+    def ema_old_age(self):
+        return self.ema[2]
+
+    @ema_old_age.setter
+    def ema_old_age(self, value):
+        self.ema[2] = value
 
     def apply_resource_limits(self, limits: ResourceLimits):
         """
         Sets resource control fields (called by PopulationBalancer).
         """
-        self._MAX_NEIGHBORS = limits.max_neighbors
-        self._FOOD_COUNT = limits.food_count
-        self._MOVE_COST = limits.move_cost
-        self._IDLE_COST = limits.idle_cost
-        self._MAX_POP = limits.max_pop
+        self.MAX_NEIGHBORS = limits.max_neighbors
+        self.FOOD_COUNT = limits.food_count
+        self.MOVE_COST = limits.move_cost
+        self.IDLE_COST = limits.idle_cost
+        self.MAX_POP = limits.max_pop
 
     def cull_agents(self, count: int):
         """
@@ -145,7 +232,35 @@ class Simulation:
         for a in kill:
             a.state.energy = -1
             a.state.death_reason = "cull"
-        print(f"[HARD CULL] t={self.tick} – removed {count} agents (max pop {self._MAX_POP})")
+        if self.verbose:
+            self.log(f"[HARD CULL] t={self.tick} – removed {count} agents (max pop {self.MAX_POP})")
+
+    def _record_recent_deaths(self, codes):
+        """
+        Appends death reason codes to the recent_deaths ring buffer, overwriting the oldest.
+        """
+        size = len(self.recent_deaths)
+        self.recent_deaths[(self._recent_deaths_head + np.arange(len(codes))) % size] = codes
+        self._recent_deaths_head = (self._recent_deaths_head + len(codes)) % size
+        self.recent_deaths_len = min(self.recent_deaths_len + len(codes), size)
+
+    def _index_positions(self):
+        """
+        Rebuilds slot_grid from the pool positions of all living agents.
+        """
+        slots = self.pool.alive_slots()
+        self.slot_grid.fill(-1)
+        self.slot_grid[self.pool.xs[slots], self.pool.ys[slots]] = slots
+
+    def agent_at(self, x, y):
+        """
+        Returns the agent on cell (x, y) as of the last tick, or None if the cell is empty
+        or off the map.
+        """
+        if not (0 <= x < self.world_w and 0 <= y < self.world_h):
+            return None
+        slot = self.slot_grid[x, y]
+        return None if slot < 0 else self.pool.agents[slot]
 
     def _current_food_zone(self):
         """
@@ -162,8 +277,42 @@ class Simulation:
         Replenishes food within the current food zone.
         """
         zone = self._current_food_zone()
-        taken = {(a.x, a.y) for a in self.agents}
-        spawn_food(self.food_set, self._FOOD_COUNT, zone, taken)
+        spawn_food(self.food_mask, self.FOOD_COUNT, zone, self.occ)
+
+    def rebuild_cell_chains(self, slots=None):
+        """
+        Relinks the living agents into the per-cell chains read by the sensing kernel,
+        first growing the chain links with the pool.
+        Args:
+            slots: Optional int array of the living slots, if already at hand.
+        """
+        pool = self.pool
+        if slots is None:
+            slots = pool.alive_slots()
+        if len(self.agent_next_in_cell) < pool.capacity:
+            self.agent_next_in_cell = np.empty(pool.capacity, dtype=np.int32)
+        build_cell_chains(slots, pool.xs, pool.ys, self.agent_cell_head, self.agent_next_in_cell)
+
+    def sense_all(self):
+        """
+        Updates the senses of every living agent in one pass of the numba kernels:
+        rebuilds the per-cell agent chains, then fills the pool's sense columns.
+        This is the batch counterpart of Agent.sense.
+        """
+        pool = self.pool
+        slots = pool.alive_slots()
+        self.rebuild_cell_chains(slots)
+        update_senses(
+            slots, pool.xs, pool.ys, pool.food_radii, pool.color_ids, pool.energies,
+            self.world_w, self.world_h, self.food_mask,
+            direction_table(int(pool.food_radii[slots].max(initial=0))),
+            self.agent_cell_head, self.agent_next_in_cell,
+            pool.sense_food, pool.sense_agents, pool.sense_friends, pool.sense_others,
+            pool.avg_energy, pool.max_energy,
+            pool.food_up, pool.food_down, pool.food_left, pool.food_right,
+            pool.food_up_dist, pool.food_down_dist, pool.food_left_dist, pool.food_right_dist,
+            pool.edge_distance_x, pool.edge_distance_y
+        )
 
     def _handle_events(self):
         """
@@ -175,18 +324,41 @@ class Simulation:
                 return False
             if ev.type == pygame.KEYDOWN and ev.key == pygame.K_SPACE:
                 self.paused = not self.paused
-                print("[PAUSE]" if self.paused else "[RUN]")
-                sys.stdout.flush()
+                if self.verbose:
+                    self.log("[PAUSE]" if self.paused else "[RUN]")
             if ev.type == pygame.MOUSEBUTTONDOWN and ev.button == 1:
                 mx, my = pygame.mouse.get_pos()
                 ax, ay = mx // GRID_SIZE, my // GRID_SIZE
-                agent = next((a for a in self.agents if a.x == ax and a.y == ay), None)
+                agent = self.agent_at(ax, ay)
                 if agent:
                     self.pinned_agent = None if self.pinned_agent is agent else agent
                 else:
                     self.pinned_agent = None
         return True
 
+    def _genome_rank(self, genome):
+        """
+        Orders genomes for top_genome by recorded deaths, ties going to the genome recorded
+        first, which is what max() over genome_stats would pick.
+        """
+        return len(self.genome_stats[genome]), -self._genome_order[genome]
+
+    def _update_overlay_cache(self):
+        """
+        Recomputes the population summaries shown by _draw_overlay, once per tick
+        rather than on every frame (frames keep drawing while paused).
+        """
+        slots = self.pool.alive_slots()
+        ages = self.pool.ages[slots]
+        counts = np.bincount(self.pool.personalities[slots], minlength=len(PERSONALITY_TYPES))
+        top = self.top_genome
+        self._overlay_cache = {
+            'mean_age': float(ages.mean()) if len(ages) else 0.0,
+            'max_age': int(ages.max()) if len(ages) else 0,
+            'personalities': {p: int(n) for p, n in zip(PERSONALITY_TYPES, counts) if n},
+            'top_genome': (top, len(self.genome_stats[top])) if top is not None else None,
+        }
+
     def _draw_overlay(self, highlight):
         """
         Draws simulation statistics and agent tooltip overlay.
@@ -203,23 +375,20 @@ class Simulation:
             y += lineh
 
         # Population/stats
-        draw_line(f"Population: {len(self.agents)}   (MAX: {self._MAX_POP})", bold=True)
-        ages = [a.age for a in self.agents]
-        draw_line(f"Mean age: {np.mean(ages):.1f}, max: {max(ages) if ages else 0}")
-        personalities = collections.Counter(a.personality for a in self.agents)
-        draw_line(f"Personalities: {dict(personalities)}")
+        cache = self._overlay_cache
+        draw_line(f"Population: {len(self.agents)}   (MAX: {self.MAX_POP})", bold=True)
+        draw_line(f"Mean age: {cache['mean_age']:.1f}, max: {cache['max_age']}")
+        draw_line(f"Personalities: {cache['personalities']}")
 
         # Deaths
-        deaths_total = sum(len(self.deaths[k]) for k in ('energy', 'old_age', 'crowd'))
-        deaths_energy = len(self.deaths.get('energy', []))
-        deaths_old = len(self.deaths.get('old_age', []))
-        deaths_crowd = len(self.deaths.get('crowd', []))
+        counts = self.death_counts
+        deaths_energy, deaths_old, deaths_crowd = counts['energy'], counts['old_age'], counts['crowd']
+        deaths_total = deaths_energy + deaths_old + deaths_crowd
         draw_line(f"Deaths: {deaths_total}   (E:{deaths_energy} O:{deaths_old} C:{deaths_crowd})")
 
         # Top genome
-        if self.genome_stats:
-            g, lst = max(self.genome_stats.items(), key=lambda kv: len(kv[1]))
-            draw_line(f"Top genome: {g}, count {len(lst)}")
+        if cache['top_genome']:
+            draw_line("Top genome: {}, count {}".format(*cache['top_genome']))
 
         # Tick/FPS
         draw_line(
@@ -262,38 +431,179 @@ class Simulation:
     def _draw(self, highlight):
         """
         Renders world (agents, traces, food, overlays).
+        While paused the world is frozen, so the last frame is presented again as long as
+        the hovered cell, pinned agent and FPS/TPS readouts are unchanged.
         """
+        mx, my = pygame.mouse.get_pos()
+        if self.paused:
+            frame_key = (self.tick, mx // GRID_SIZE, my // GRID_SIZE, self.pinned_agent, self._fps, self._tps)
+            if frame_key == self._paused_frame_key:
+                pygame.display.flip()
+                return
+            self._paused_frame_key = frame_key
+        else:
+            self._paused_frame_key = None
+
         self.screen.fill((0, 0, 0))
-        for (tx, ty), tval in self.trace_map.items():
-            age = self.tick - tval
-            if age < TRACE_LENGTH:
-                alpha = int(48 * (1 - age / TRACE_LENGTH)) + 24
-                s = pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
-                s.fill((120, 120, 120, alpha))
-                self.screen.blit(s, (tx * GRID_SIZE, ty * GRID_SIZE))
+        traces = []
+        for t, txs, tys in self._trace_queue:
+            age = self.tick - t
+            if age >= TRACE_LENGTH:
+                continue
+            # A cell left again on a later tick is drawn once, with its youngest trace
+            latest = self.trace_tick[txs, tys] == t
+            surf = self._trace_surfs[age]
+            traces += [(surf, (tx * GRID_SIZE, ty * GRID_SIZE))
+                       for tx, ty in zip(txs[latest].tolist(), tys[latest].tolist())]
+        self.screen.blits(traces, doreturn=False)
 
         # Agent highlight
-        if self.pinned_agent in self.agents:
-            hl = self.pinned_agent
+        pinned = self.pinned_agent
+        if pinned is not None and self.pool.agents[pinned.slot] is pinned:
+            hl = pinned
         else:
-            mx, my = pygame.mouse.get_pos()
-            hl = next((a for a in self.agents if a.x == mx // GRID_SIZE and a.y == my // GRID_SIZE), None)
-
-        if highlight:
-            for (vx, vy) in highlight.visited_last_10:
-                s = pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
-                s.fill((255, 255, 128, 90))
-                self.screen.blit(s, (vx * GRID_SIZE, vy * GRID_SIZE))
-        for fx, fy in self.food_set:
-            pygame.draw.rect(
-                self.screen, (0, 200, 0),
-                (fx * GRID_SIZE + 4, fy * GRID_SIZE + 4, GRID_SIZE - 8, GRID_SIZE - 8)
+            hl = self.agent_at(mx // GRID_SIZE, my // GRID_SIZE)
+        # 'highlight' was looked up before the tick; drop it if it died, its slot may be reused
+        if highlight is not None and self.pool.agents[highlight.slot] is not highlight:
+            highlight = None
+
+        if highlight is not None:
+            self.screen.blits(
+                [(self._visited_surf, (vx * GRID_SIZE, vy * GRID_SIZE)) for vx, vy in highlight.visited_last_10],
+                doreturn=False
             )
-        for a in self.agents:
-            a.draw(self.screen, highlight is a)
+        fxs, fys = np.nonzero(self.food_mask)
+        self.screen.blits(
+            [(self._food_surf, (fx * GRID_SIZE + 4, fy * GRID_SIZE + 4)) for fx, fy in zip(fxs.tolist(), fys.tolist())],
+            doreturn=False
+        )
+        slots = self.pool.alive_slots()
+        AgentRenderer.draw_batch(self.screen, self.pool.xs[slots], self.pool.ys[slots], self.pool.colors[slots])
+        if highlight is not None:
+            highlight.draw(self.screen, highlight=True)
         self._draw_overlay(hl)
         pygame.display.flip()
 
+    def reset_lstm_state(self, slots):
+        """
+        Zeroes the device-resident LSTM state of newly claimed pool slots,
+        first growing it if the pool has grown past it.
+        Args:
+            slots: Int array of the claimed slots.
+        """
+        capacity = self.pool.capacity
+        if self.lstm_h.shape[1] < capacity:
+            grown_h = self.lstm_h.new_zeros(NN_LAYERS, capacity, NN_HIDDEN)
+            grown_c = torch.zeros_like(grown_h)
+            grown_h[:, :self.lstm_h.shape[1]] = self.lstm_h
+            grown_c[:, :self.lstm_c.shape[1]] = self.lstm_c
+            self.lstm_h, self.lstm_c = grown_h, grown_c
+        slots_t = torch.as_tensor(np.asarray(slots, dtype=np.int64), device=self.device)
+        self.lstm_h.index_fill_(1, slots_t, 0.0)
+        self.lstm_c.index_fill_(1, slots_t, 0.0)
+
+    def step_brains(self):
+        """
+        Runs one batched brain pass for all living agents and moves them all at once.
+        Inputs are built into a single matrix, LSTM states are gathered from the
+        device-resident per-slot tensors, the shared BatchedLSTM is called once,
+        new states are scattered back on-device and actions are sampled for
+        the whole batch in one call.
+        """
+        slots = self.pool.alive_slots()
+        slots = slots[self.pool.energies[slots] > 0]
+        if not len(slots):
+            return
+        if len(self.inputs) < self.pool.capacity:
+            self.inputs = np.empty((self.pool.capacity, AgentBrain.N_INPUTS), dtype=np.float32)
+        inputs_np = AgentBrain.build_inputs_batch(self, slots, out=self.inputs[:len(slots)])  # [N, input_size]
+        slots_t = torch.from_numpy(slots).to(self.device, non_blocking=True)
+        inputs_t = torch.from_numpy(inputs_np).unsqueeze(1).to(self.device, non_blocking=True)
+        with torch.no_grad():
+            # index_select/index_copy_ skip the generic advanced-indexing path of [:, slots_t]
+            probs, h_new, c_new = self.brain.forward_batch(
+                inputs_t, self.lstm_h.index_select(1, slots_t), self.lstm_c.index_select(1, slots_t)
+            )
+            self.lstm_h.index_copy_(1, slots_t, h_new)
+            self.lstm_c.index_copy_(1, slots_t, c_new)
+            if NN_GREEDY_ACTIONS:
+                actions = probs.argmax(dim=-1)
+            else:
+                actions = torch.multinomial(probs, num_samples=1, generator=self.action_generator).squeeze(1)
+        # Only the [N] action vector leaves the device
+        actions = actions.cpu().numpy()
+
+        old_xs, old_ys = self.pool.move(
+            slots, actions, self.occ, self.MOVE_COST, self.IDLE_COST
+        )
+        self.record_traces(old_xs, old_ys)
+
+    def record_traces(self, xs, ys):
+        """
+        Stamps the current tick on the cells agents just left and queues them for drawing,
+        each cell once even if several agents left it this tick.
+        Args:
+            xs, ys: Int arrays of the cells left.
+        """
+        if self._trace_queue and self._trace_queue[-1][0] == self.tick:
+            # Merge with the cells already left this tick (e.g. by single-agent moves)
+            _, prev_xs, prev_ys = self._trace_queue.pop()
+            xs, ys = np.concatenate((prev_xs, xs)), np.concatenate((prev_ys, ys))
+        # Duplicate cells keep exactly one of these distinct markers
+        marks = -2 - np.arange(len(xs), dtype=np.int32)
+        self.trace_tick[xs, ys] = marks
+        first = self.trace_tick[xs, ys] == marks
+        self.trace_tick[xs, ys] = self.tick
+        self._trace_queue.append((self.tick, xs[first], ys[first]))
+
+    def _remove_dead_agents(self):
+        """
+        Drops agents with no energy left from self.agents in place, moving the last agent
+        into each freed position instead of rebuilding the list.
+        Returns:
+            np.ndarray: Pool slots of the remaining agents, in self.agents order.
+        """
+        agents = self.agents
+        slots = np.fromiter((a.state.slot for a in agents), dtype=np.intp, count=len(agents))
+        n = len(agents)
+        for i in np.flatnonzero(self.pool.energies[slots] <= 0)[::-1].tolist():
+            n -= 1
+            agents[i] = agents[n]
+            slots[i] = slots[n]
+            agents.pop()
+        return slots[:n]
+
+    def _reproduce(self, slots):
+        """
+        Breeds every agent with enough energy into a random free neighboring cell
+        (no agent, no food), then spawns all children at once. The free-neighbor grid
+        lookups run for all parents together; only the final pick loops over parents,
+        in agent order, so that earlier children block later ones.
+        Args:
+            slots: Int array of pool slots of self.agents, in list order.
+        """
+        pool, occ = self.pool, self.occ
+        candidates = slots[pool.energies[slots] >= ENERGY_TO_REPRODUCE]
+        nxs = np.clip(pool.xs[candidates, None] + MOVES[:, 0], 0, self.world_w - 1)  # [K, 4]
+        nys = np.clip(pool.ys[candidates, None] + MOVES[:, 1], 0, self.world_h - 1)
+        free = (occ[nxs, nys] == 0) & ~self.food_mask[nxs, nys]
+
+        parents, child_xs, child_ys = [], [], []
+        has_free = free.any(axis=1)
+        for slot, row_x, row_y, row_free in zip(
+            candidates[has_free].tolist(), nxs[has_free].tolist(), nys[has_free].tolist(), free[has_free].tolist()
+        ):
+            empty = [(nx, ny) for nx, ny, ok in zip(row_x, row_y, row_free) if ok and not occ[nx, ny]]
+            if empty:
+                nx, ny = random.choice(empty)
+                occ[nx, ny] = 1
+                parents.append(slot)
+                child_xs.append(nx)
+                child_ys.append(ny)
+        children = pool.reproduce_batch(np.array(parents, dtype=np.intp), child_xs, child_ys, self.rng)
+        self.reset_lstm_state(children)
+        self.agents.extend(Agent.from_slot(self, slot) for slot in children)
+
     def run(self):
         """
         Main simulation loop. Handles ticks, neural inference, world updates, agent logic, UI and drawing.
@@ -307,83 +617,44 @@ class Simulation:
         while running:
             running = self._handle_events()
             mx, my = pygame.mouse.get_pos()
-            highlight = next((a for a in self.agents if a.x == mx // GRID_SIZE and a.y == my // GRID_SIZE), None)
+            highlight = self.agent_at(mx // GRID_SIZE, my // GRID_SIZE)
 
             now = time.time()
             if not self.paused:
                 # --- Simulation tick ---
                 if self.tick % self.food_zone_duration == 0:
                     self.food_zone_idx = (self.food_zone_idx + 1) % len(food_zones)
-                    print(f"[ZONE] now {self.food_zone_idx} -> {food_zones[self.food_zone_idx]}")
-                    self.food_set.clear()
+                    if self.verbose:
+                        self.log(f"[ZONE] now {self.food_zone_idx} -> {food_zones[self.food_zone_idx]}")
+                    self.food_mask.fill(False)
                 self._spawn_food()
-                food_grid = set(self.food_set)
-                agent_grid = collections.defaultdict(list)
-                for a in self.agents:
-                    agent_grid[(a.x, a.y)].append(a)
-                for a in self.agents:
-                    a.sense(food_grid, agent_grid)
-                inputs, hiddens, cells, active_idx = [], [], [], []
-                for idx, a in enumerate(self.agents):
-                    if a.energy > 0:
-                        inputs.append(a.get_inputs())
-                        hiddens.append(a.lstm_hidden)
-                        cells.append(a.lstm_cell)
-                        active_idx.append(idx)
-                if inputs:
-                    inputs_np = np.stack(inputs, axis=0)
-                    hiddens_np = np.stack(hiddens, axis=0)
-                    cells_np = np.stack(cells, axis=0)
-                    inputs_t = torch.from_numpy(inputs_np).to(dtype=torch.float32, device=self.device).unsqueeze(1)
-                    hiddens_t = torch.from_numpy(hiddens_np).to(dtype=torch.float32, device=self.device).transpose(0, 1)
-                    cells_t = torch.from_numpy(cells_np).to(dtype=torch.float32, device=self.device).transpose(0, 1)
-                    with torch.no_grad():
-                        probs, h_new, c_new = self.brain(inputs_t, hiddens_t, cells_t)
-                    probs = probs.cpu().numpy()
-                    h_new = h_new.cpu().numpy().transpose(1, 0, 2)
-                    c_new = c_new.cpu().numpy().transpose(1, 0, 2)
-                    taken = {(a.x, a.y) for a in self.agents}
-                    self.trace_map = {}
-                    for i, agent_idx in enumerate(active_idx):
-                        a = self.agents[agent_idx]
-                        action = np.random.choice(4, p=probs[i])
-                        a.apply_move(action, h_new[i], c_new[i], taken, self.trace_map, self.tick)
-                        taken.add((a.x, a.y))
-                for a in self.agents:
-                    if a.energy > 0:
-                        a.eat(self.food_set)
-                        a.step()
-                dead = [a for a in self.agents if a.energy <= 0]
-                for a in dead:
-                    self.genome_stats[(a.color, a.food_radius, a.agent_radius, a.personality)].append(
-                        (a.age, a.offspring_count))
+                self.sense_all()
+                self.step_brains()
+                alive_slots = self.pool.alive_slots()
+                active = alive_slots[self.pool.energies[alive_slots] > 0]
+                self.pool.eat(active, self.food_mask)
+                self.pool.step(active, self.MAX_NEIGHBORS)
+                dead_slots = alive_slots[self.pool.energies[alive_slots] <= 0]
+                self._record_recent_deaths(self.pool.death_reasons[dead_slots])
+                for a in self.pool.agents[dead_slots]:
+                    genome = (a.color, a.food_radius, a.agent_radius, a.personality)
+                    self._genome_order.setdefault(genome, len(self._genome_order))
+                    self.genome_stats[genome].append((a.age, a.offspring_count))
+                    if self.top_genome is None or self._genome_rank(genome) > self._genome_rank(self.top_genome):
+                        self.top_genome = genome
                     self.deaths[a.death_reason].append(a.age)
                     self.deaths['all'].append(a.age)
-                    self.recent_deaths.append(a.death_reason)
-                self.agents = [a for a in self.agents if a.energy > 0]
-                # Reproduction
-                new_agents = []
-                taken = {(a.x, a.y) for a in self.agents}
-                for a in self.agents:
-                    if not a.can_reproduce():
-                        continue
-                    empty = []
-                    for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                        nx, ny = clamp(a.x + dx, 0, self.world_w - 1), clamp(a.y + dy, 0, self.world_h - 1)
-                        if ((nx, ny) not in taken) and ((nx, ny) not in self.food_set):
-                            empty.append((nx, ny))
-                    if empty:
-                        nx, ny = random.choice(empty)
-                        child = a.reproduce()
-                        child.state.x, child.state.y = nx, ny
-                        taken.add((nx, ny))
-                        new_agents.append(child)
-                self.agents.extend(new_agents)
+                    self.death_counts[a.death_reason] += 1
+                    self.death_counts['all'] += 1
+                    self.pool.release(a.state.slot)
+                np.subtract.at(self.occ, (self.pool.xs[dead_slots], self.pool.ys[dead_slots]), np.uint8(1))
+                self._reproduce(self._remove_dead_agents())
+                self._index_positions()
                 if self.tick % 10 == 0:
                     self.balancer.balance()
-                if self.tick % 500 == 0:
-                    print_population_stats(self.tick, self.agents, self.genome_stats, self.deaths)
-                    sys.stdout.flush()
+                if self.verbose and self.tick % 500 == 0:
+                    print_population_stats(self.tick, self.agents, self.genome_stats, self.deaths, log=self.log)
+                self._update_overlay_cache()
                 self.tick += 1
                 tick_counter += 1
             # --- Always draw board & stats (even when paused) ---
@@ -398,7 +669,8 @@ class Simulation:
                 prev_tick_time = now2
                 tick_counter = 0
                 draw_counter = 0
-            self.clock.tick(30)
+            self.clock.tick(10 if self.paused else 30)
         pygame.quit()
+        self._log_q.join()
         print_population_stats(self.tick, self.agents, self.genome_stats, self.deaths)
         sys.stdout.flush()
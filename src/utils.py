@@ -3,7 +3,7 @@ from collections import Counter
 
 import numpy as np
 
-from src.config import PERSONALITY_TYPES, PERSONALITY_MUTATION_RATE
+from src.config import PERSONALITY_TYPES
 
 
 def clamp(val, low, high):
@@ -13,20 +13,6 @@ def clamp(val, low, high):
     return max(low, min(high, val))
 
 
-def random_color():
-    """
-    Returns a random RGB color as a tuple of three ints [0, 255).
-    """
-    return tuple(np.random.randint(0, 255, 3))
-
-
-def random_pos_in_zone(x0, x1, y0, y1):
-    """
-    Returns a random (x, y) position within the rectangular zone [x0, x1), [y0, y1).
-    """
-    return random.randint(x0, x1 - 1), random.randint(y0, y1 - 1)
-
-
 def random_personality():
     """
     Returns a random agent personality string.
@@ -34,50 +20,78 @@ def random_personality():
     return random.choice(PERSONALITY_TYPES)
 
 
-def mutate_personality(parent):
+def batched_agent_params(n, zone, sensor_range):
     """
-    With probability PERSONALITY_MUTATION_RATE, mutate personality; otherwise, return parent.
+    Draws the random parameters of n new agents at once.
+    Args:
+        n: number of agents
+        zone: (x0, x1, y0, y1) rectangular bounds for positions
+        sensor_range: (low, high) inclusive bounds for both sensing radii
+    Returns:
+        Tuple of xs [n], ys [n], colors [n, 3] in [0, 255), food_radii [n], agent_radii [n]
+        as int arrays, and a list of n personality strings.
     """
-    return random_personality() if random.random() < PERSONALITY_MUTATION_RATE else parent
+    x0, x1, y0, y1 = zone
+    low, high = sensor_range
+    xs = np.random.randint(x0, x1, n)
+    ys = np.random.randint(y0, y1, n)
+    colors = np.random.randint(0, 255, (n, 3))
+    food_radii = np.random.randint(low, high + 1, n)
+    agent_radii = np.random.randint(low, high + 1, n)
+    personalities = [PERSONALITY_TYPES[i] for i in np.random.randint(0, len(PERSONALITY_TYPES), n)]
+    return xs, ys, colors, food_radii, agent_radii, personalities
 
 
-def spawn_food(food_set, desired_count, zone, taken):
+def spawn_food(food_mask, desired_count, zone, taken):
     """
-    Spawns food at random positions within a zone, avoiding conflicts with taken positions.
-    Modifies food_set in-place.
+    Spawns food at random positions within a zone, avoiding food and occupied cells.
+    Candidates are drawn in vectorized batches (twice the shortfall each), with the same
+    budget of desired_count * 10 attempts as one-at-a-time sampling.
+    Modifies food_mask in-place.
     Args:
-        food_set: set to add food positions to (set of (x, y))
+        food_mask: bool array [world_w, world_h] to mark food positions in
         desired_count: number of food items to spawn
         zone: (x0, x1, y0, y1) rectangular bounds
-        taken: set of forbidden positions (occupied by agents or other food)
+        taken: int array [world_w, world_h], nonzero where agents occupy a cell
     """
     x0, x1, y0, y1 = zone
+    count = int(np.count_nonzero(food_mask))
+    if count >= desired_count:
+        return
+    blocked = food_mask | (taken > 0)
     tries = 0
-    while len(food_set) < desired_count and tries < desired_count * 10:
-        pos = random_pos_in_zone(x0, x1, y0, y1)
-        if pos in food_set or pos in taken:
-            tries += 1
-            continue
-        food_set.add(pos)
-        tries += 1
-
-
-def print_population_stats(tick, agents, genome_stats, deaths):
+    while count < desired_count and tries < desired_count * 10:
+        n = min(2 * (desired_count - count), desired_count * 10 - tries)
+        xs = np.random.randint(x0, x1, n)
+        ys = np.random.randint(y0, y1, n)
+        tries += n
+        free = np.flatnonzero(~blocked[xs, ys])
+        # Keep the first draw of each distinct free cell, in draw order
+        _, first = np.unique(xs[free] * food_mask.shape[1] + ys[free], return_index=True)
+        accepted = free[np.sort(first)][:desired_count - count]
+        food_mask[xs[accepted], ys[accepted]] = True
+        blocked[xs[accepted], ys[accepted]] = True
+        count += len(accepted)
+
+
+def print_population_stats(tick, agents, genome_stats, deaths, log=print):
     """
     Prints summary statistics for the current population and deaths.
     Intended for debugging and monitoring in console.
+    Args:
+        log: Callable taking the whole summary as one string (default: print).
     """
-    print(f"\n--- Tick {tick} ---")
-    print(f"Population: {len(agents)}")
+    lines = [f"\n--- Tick {tick} ---", f"Population: {len(agents)}"]
     if agents:
         ages = [a.age for a in agents]
-        print(f"Mean age: {np.mean(ages):.1f}, max: {max(ages)}")
+        lines.append(f"Mean age: {np.mean(ages):.1f}, max: {max(ages)}")
         personalities = Counter(a.personality for a in agents)
-        print(f"Personalities: {dict(personalities)}")
+        lines.append(f"Personalities: {dict(personalities)}")
         if genome_stats:
             g, lst = max(genome_stats.items(), key=lambda kv: len(kv[1]))
-            print(f"Top genome {g}, count {len(lst)}")
+            lines.append(f"Top genome {g}, count {len(lst)}")
     if deaths:
         for k in ('energy', 'old_age', 'crowd'):
-            print(f"Deaths {k}: {len(deaths.get(k, []))}")
-        print(f"All deaths: {len(deaths.get('all', []))}")
+            lines.append(f"Deaths {k}: {len(deaths.get(k, []))}")
+        lines.append(f"All deaths: {len(deaths.get('all', []))}")
+    log("\n".join(lines))